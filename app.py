@@ -1,9 +1,8 @@
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from io import BytesIO
 
 # -------------------------------
@@ -14,82 +13,301 @@ st.set_page_config(page_title="📊 Superstore Sales Dashboard", layout="wide")
 # -------------------------------
 # Load Data
 # -------------------------------
-@st.cache_data
+# Cached as a resource: one prepared frame is shared by every session in
+# the process instead of being unpickled on each call. Callers must treat
+# it as read-only.
+@st.cache_resource
 def load_data():
-    df = pd.read_csv("data/Superstore.csv", encoding="latin1")
-    df.columns = [c.strip() for c in df.columns]
-    df["Order Date"] = pd.to_datetime(df["Order Date"], errors="coerce")
-    df["Ship Date"] = pd.to_datetime(df["Ship Date"], errors="coerce")
-    df["ProfitMargin"] = df["Profit"] / df["Sales"]
+    # Parquet is produced once by scripts/convert_to_parquet.py with clean
+    # column names and datetime columns already parsed.
+    df = pd.read_parquet("data/Superstore.parquet", engine="pyarrow")
+    # Dictionary-encode the low-cardinality text columns so filtering and
+    # grouping work on small integer codes instead of hashing strings.
+    for c in ("Region", "Category", "Sub-Category", "Product Name", "Segment", "Ship Mode"):
+        df[c] = df[c].astype("category")
+    # Zero-sales rows get NaN once here instead of producing inf.
+    sales = df["Sales"].to_numpy()
+    margin = np.full(sales.shape, np.nan)
+    np.divide(df["Profit"].to_numpy(), sales, out=margin, where=sales != 0)
+    df["ProfitMargin"] = margin
+    # Keep rows in Order Date order so every filtered subset is sorted too
+    # and per-month totals are sums over contiguous runs. The stable sort
+    # keeps same-day rows in file order and the original index is kept.
+    df = df.sort_values("Order Date", kind="stable")
     return df
 
-df = load_data()
+@st.cache_data
+def filter_options():
+    # Computed once rather than on every rerun; astype("category") already
+    # stores the categories sorted and unique.
+    df = load_data()
+    return df["Region"].cat.categories.tolist(), df["Category"].cat.categories.tolist()
+
+region_options, category_options = filter_options()
+
+# -------------------------------
+# Cached Aggregations
+# -------------------------------
+# Keyed on sorted tuples of the selected regions/categories so that
+# reruns with unchanged filters reuse the previous results.
+def category_mask(column, values):
+    # Compare small integer category codes instead of strings; unknown
+    # values map to -1 and are dropped so they cannot match missing rows.
+    codes = column.cat.categories.get_indexer(values)
+    return np.isin(column.cat.codes.to_numpy(), codes[codes >= 0])
+
+@st.cache_data
+def filter_data(regions, categories):
+    df = load_data()
+    mask = category_mask(df["Region"], regions)
+    mask &= category_mask(df["Category"], categories)
+    return df.take(np.flatnonzero(mask))
+
+@st.cache_data
+def compute_kpis(regions, categories):
+    filtered_df = filter_data(regions, categories)
+    # An empty selection has no margin; np.nanmean would warn about it.
+    avg_margin = np.nanmean(filtered_df["ProfitMargin"].to_numpy()) if len(filtered_df) else np.nan
+    return filtered_df["Sales"].sum(), filtered_df["Profit"].sum(), avg_margin
+
+# A single sales cube pre-aggregated over the full dataset once, in one
+# groupby pass; the region and product charts only reduce the cells
+# matching the selection. The frame keeps full precision for the viewer
+# and downloads; chart values such as these sums are cast to float32,
+# halving the payload sent to the browser.
+@st.cache_data
+def load_sales_cube():
+    df = load_data()
+    return df.groupby(["Region", "Category", "Product Name"], observed=True)["Sales"].sum().astype("float32")
+
+def select_cells(cube, regions, categories):
+    index = cube.index
+    return cube[index.get_level_values("Region").isin(regions) & index.get_level_values("Category").isin(categories)]
+
+def sum_sorted_runs(keys, values):
+    # Filtered rows are already in date order, so each distinct key is one
+    # contiguous run and a single np.add.reduceat pass sums them all.
+    run_start = np.ones(len(keys), dtype=bool)
+    run_start[1:] = keys[1:] != keys[:-1]
+    starts = np.flatnonzero(run_start)
+    return keys[starts], np.add.reduceat(values, starts)
+
+def dated_sales(filtered_df):
+    # Unparseable order dates are NaT after conversion and sort to the end.
+    # They are dropped here, as resample/groupby on the date used to do: NaT
+    # never equals itself, so each would otherwise become its own run, and
+    # a trailing NaT breaks the month range below.
+    dates = filtered_df["Order Date"].to_numpy()
+    dated = ~np.isnat(dates)
+    # float32 for the chart payload, as with the sales cube.
+    return dates[dated], filtered_df["Sales"].to_numpy(dtype=np.float32)[dated]
+
+@st.cache_data
+def compute_monthly(regions, categories):
+    dates, sales = dated_sales(filter_data(regions, categories))
+    months, sales = sum_sorted_runs(dates.astype("datetime64[M]"), sales)
+    if len(months):
+        # Months without any sales are plotted as 0 rather than skipped.
+        all_months = np.arange(months[0], months[-1] + 1)
+        totals = np.zeros(len(all_months), dtype=np.float32)
+        totals[(months - months[0]).astype(np.intp)] = sales
+        months, sales = all_months, totals
+    return pd.DataFrame({"Month": months, "Sales": sales})
+
+@st.cache_data
+def compute_region_sales(regions, categories):
+    return select_cells(load_sales_cube(), regions, categories).groupby(level="Region", observed=True).sum().reset_index()
+
+@st.cache_data
+def compute_top_products(regions, categories):
+    cells = select_cells(load_sales_cube(), regions, categories)
+    sums = cells.groupby(level="Product Name", observed=True).sum()
+    sales = sums.to_numpy()
+    # Partial selection of the 10 largest, then sort just those 10.
+    top = np.argpartition(-sales, 9)[:10] if len(sales) > 10 else np.arange(len(sales))
+    top = top[np.argsort(-sales[top], kind="stable")]
+    return pd.DataFrame({"Product Name": sums.index.to_numpy()[top], "Sales": sales[top]})
+
+@st.cache_data
+def compute_discount_profit_box(regions, categories):
+    # Box statistics per discount level (there are only a dozen or so), with
+    # whiskers at the Tukey fences; outlier points are not sent.
+    # float32 for the chart payload, as with the sales cube.
+    filtered_df = filter_data(regions, categories)
+    discount = filtered_df["Discount"].to_numpy(dtype=np.float32)
+    profit = filtered_df["Profit"].to_numpy(dtype=np.float32)
+    levels = np.unique(discount)
+    stats = np.empty((len(levels), 5), dtype=np.float32)
+    for i, level in enumerate(levels):
+        values = profit[discount == level]
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        reach = 1.5 * (q3 - q1)
+        lower = values[values >= q1 - reach].min()
+        upper = values[values <= q3 + reach].max()
+        stats[i] = (q1, median, q3, lower, upper)
+    return levels, stats
+
+@st.cache_data
+def compute_daily_sales(regions, categories):
+    # NaT dates are dropped so they cannot enter the forecast as extra days.
+    dates, sales = sum_sorted_runs(*dated_sales(filter_data(regions, categories)))
+    return pd.DataFrame({"Order Date": dates, "Sales": sales})
+
+def holt_forecast(y, horizon, grid_size=50):
+    """Additive-trend (Holt) exponential smoothing forecast.
+
+    The smoothing weights are picked by a grid search over (alpha, beta)
+    minimising the one-step-ahead squared error, with the grid spaced
+    more finely near zero where daily sales series tend to land. The
+    recursion is linear in the initial level and trend, so it is run for
+    the data from a zero start plus two unit starts without data; the
+    best initial state for every grid point is then a closed-form 2x2
+    least-squares solve instead of a guess from individual days.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    grid = np.linspace(0.0, 1.0, grid_size) ** 2
+    alpha, beta = np.meshgrid(grid, grid, indexing="ij")
+    # Run 0 follows the data from level=trend=0; runs 1 and 2 follow a unit
+    # initial level and a unit initial trend respectively, with no data.
+    level = np.zeros((3,) + alpha.shape)
+    trend = np.zeros((3,) + alpha.shape)
+    level[1] = 1.0
+    trend[2] = 1.0
+    data_run = np.array([1.0, 0.0, 0.0])[:, None, None]
+    g00 = g01 = g02 = g11 = g12 = g22 = 0.0
+    for obs in y:
+        err = obs * data_run - (level + trend)
+        e0, e1, e2 = err
+        g00 = g00 + e0 * e0
+        g01 = g01 + e0 * e1
+        g02 = g02 + e0 * e2
+        g11 = g11 + e1 * e1
+        g12 = g12 + e1 * e2
+        g22 = g22 + e2 * e2
+        level = level + trend + alpha * err
+        trend = trend + alpha * beta * err
+    # Minimise the quadratic SSE in the initial (level, trend) per grid point.
+    det = g11 * g22 - g12 * g12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level0 = (g12 * g02 - g22 * g01) / det
+        trend0 = (g12 * g01 - g11 * g02) / det
+        sse = g00 + g01 * level0 + g02 * trend0
+    sse[~np.isfinite(sse) | (det <= 1e-12 * g11 * g22)] = np.inf
+    best = np.unravel_index(np.argmin(sse), sse.shape)
+    start = np.array([1.0, level0[best], trend0[best]])
+    final_level = start @ level[(slice(None),) + best]
+    final_trend = start @ trend[(slice(None),) + best]
+    return final_level + final_trend * np.arange(1, horizon + 1)
+
+@st.cache_data
+def compute_forecast(regions, categories, horizon=30):
+    return holt_forecast(compute_daily_sales(regions, categories)["Sales"].to_numpy(), horizon)
+
+@st.cache_data
+def compute_csv_bytes(regions, categories):
+    # Encode straight into a byte buffer instead of building a str first.
+    buffer = BytesIO()
+    filter_data(regions, categories).to_csv(buffer, index=False, encoding="utf-8")
+    return buffer.getvalue()
+
+@st.cache_data
+def compute_parquet_bytes(regions, categories):
+    buffer = BytesIO()
+    filter_data(regions, categories).to_parquet(buffer, engine="pyarrow", index=False)
+    return buffer.getvalue()
 
 # -------------------------------
 # Sidebar Filters
 # -------------------------------
 st.sidebar.header("🔍 Filters")
-regions = sorted(df["Region"].dropna().unique())
-categories = sorted(df["Category"].dropna().unique())
 
-region = st.sidebar.multiselect("Select Region(s)", regions, default=regions)
-category = st.sidebar.multiselect("Select Category(s)", categories, default=categories)
+region = st.sidebar.multiselect("Select Region(s)", region_options, default=region_options)
+category = st.sidebar.multiselect("Select Category(s)", category_options, default=category_options)
 
-filtered_df = df[(df["Region"].isin(region)) & (df["Category"].isin(category))]
+key = (tuple(sorted(region)), tuple(sorted(category)))
+filtered_df = filter_data(*key)
 
 # -------------------------------
 # KPIs
 # -------------------------------
 st.title("📈 Superstore Sales Dashboard")
 
+total_sales, total_profit, avg_margin = compute_kpis(*key)
+
 col1, col2, col3 = st.columns(3)
-col1.metric("💰 Total Sales", f"${filtered_df['Sales'].sum():,.0f}")
-col2.metric("📊 Total Profit", f"${filtered_df['Profit'].sum():,.0f}")
-col3.metric("📈 Avg Profit Margin", f"{filtered_df['ProfitMargin'].mean() * 100:.2f}%")
+col1.metric("💰 Total Sales", f"${total_sales:,.0f}")
+col2.metric("📊 Total Profit", f"${total_profit:,.0f}")
+col3.metric("📈 Avg Profit Margin", f"{avg_margin * 100:.2f}%")
 
 st.markdown("---")
 
 # -------------------------------
 # Charts
 # -------------------------------
-fig = make_subplots(rows=2, cols=2,
-                    subplot_titles=("Monthly Sales","Sales by Region","Top Products","Discount vs Profit"))
+@st.cache_resource
+def summary_layout():
+    # The subplot grid, titles and axes never depend on the filters, so the
+    # layout is built once and only the traces are rebuilt per selection.
+    # uirevision keeps the user's zoom/pan when only the data changes.
+    fig = make_subplots(rows=2, cols=2,
+                        subplot_titles=("Monthly Sales","Sales by Region","Top Products","Discount vs Profit"))
+    fig.update_layout(height=800, showlegend=False, title_text="Superstore — Summary Dashboard",
+                      uirevision="filters")
+    return fig.layout.to_plotly_json()
+
+# Figures are cached as shared go.Figure resources per filter selection.
+# Cache hits skip trace assembly, and because st.plotly_chart receives a
+# Figure rather than a dict it does not rebuild and re-validate it; it
+# still serializes the figure on every rerun. The figures are read-only.
+@st.cache_resource
+def build_summary_fig(regions, categories):
+    # Monthly Sales
+    monthly = compute_monthly(regions, categories)
+    monthly_trace = go.Scattergl(x=monthly["Month"], y=monthly["Sales"], name="Monthly Sales",
+                                 xaxis="x", yaxis="y")
+
+    # Sales by Region
+    region_df = compute_region_sales(regions, categories)
+    region_trace = go.Bar(x=region_df["Region"], y=region_df["Sales"], name="Sales by Region",
+                          xaxis="x2", yaxis="y2")
+
+    # Top Products
+    top10 = compute_top_products(regions, categories)
+    top_trace = go.Bar(x=top10["Sales"], y=top10["Product Name"], orientation="h", name="Top Products",
+                       xaxis="x3", yaxis="y3")
 
-# Monthly Sales
-monthly = filtered_df.set_index("Order Date").resample("M")["Sales"].sum().reset_index()
-fig.add_trace(go.Scatter(x=monthly["Order Date"], y=monthly["Sales"], name="Monthly Sales"), row=1, col=1)
+    # Discount vs Profit (per-discount quartiles so the payload does not grow with the row count)
+    discount_levels, box_stats = compute_discount_profit_box(regions, categories)
+    # Discount levels are unevenly spaced (0.3 next to 0.32), so plot them
+    # as evenly spaced categories to keep the boxes readable.
+    box_trace = go.Box(x=[f"{d:.0%}" for d in discount_levels], q1=box_stats[:, 0], median=box_stats[:, 1], q3=box_stats[:, 2],
+                       lowerfence=box_stats[:, 3], upperfence=box_stats[:, 4], name="Discount vs Profit",
+                       xaxis="x4", yaxis="y4")
 
-# Sales by Region
-region_df = filtered_df.groupby("Region", as_index=False)["Sales"].sum()
-fig.add_trace(go.Bar(x=region_df["Region"], y=region_df["Sales"], name="Sales by Region"), row=1, col=2)
+    return go.Figure(data=[monthly_trace, region_trace, top_trace, box_trace], layout=summary_layout())
 
-# Top Products
-top10 = filtered_df.groupby("Product Name")["Sales"].sum().nlargest(10).reset_index()
-fig.add_trace(go.Bar(x=top10["Sales"], y=top10["Product Name"], orientation="h", name="Top Products"), row=2, col=1)
+@st.cache_resource
+def build_forecast_fig(regions, categories):
+    sales_ts = compute_daily_sales(regions, categories)
+    forecast = compute_forecast(regions, categories)
+    forecast_dates = pd.date_range(sales_ts["Order Date"].max(), periods=30, freq="D")
 
-# Discount vs Profit
-fig.add_trace(go.Scatter(x=filtered_df["Discount"], y=filtered_df["Profit"], mode="markers",
-                         name="Discount vs Profit", marker=dict(size=6, opacity=0.6)), row=2, col=2)
+    fig_forecast = go.Figure()
+    fig_forecast.add_trace(go.Scattergl(x=sales_ts["Order Date"], y=sales_ts["Sales"], name="Actual Sales"))
+    fig_forecast.add_trace(go.Scattergl(x=forecast_dates, y=forecast, name="Forecast", line=dict(dash="dot")))
+    fig_forecast.update_layout(uirevision="filters")
+    return fig_forecast
 
-fig.update_layout(height=800, showlegend=False, title_text="Superstore — Summary Dashboard")
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(build_summary_fig(*key), use_container_width=True)
 
 # -------------------------------
 # 30-Day Sales Forecast
 # -------------------------------
 st.subheader("⏱️ 30-Day Sales Forecast (Exponential Smoothing)")
 
-sales_ts = filtered_df.groupby("Order Date")[["Sales"]].sum().reset_index()
+sales_ts = compute_daily_sales(*key)
 if len(sales_ts) > 20:
-    model = ExponentialSmoothing(sales_ts["Sales"], trend="add", seasonal=None)
-    fit = model.fit()
-    forecast = fit.forecast(30)
-    forecast_dates = pd.date_range(sales_ts["Order Date"].max(), periods=30, freq="D")
-
-    fig_forecast = go.Figure()
-    fig_forecast.add_trace(go.Scatter(x=sales_ts["Order Date"], y=sales_ts["Sales"], name="Actual Sales"))
-    fig_forecast.add_trace(go.Scatter(x=forecast_dates, y=forecast, name="Forecast", line=dict(dash="dot")))
-    st.plotly_chart(fig_forecast, use_container_width=True)
+    st.plotly_chart(build_forecast_fig(*key), use_container_width=True)
 else:
     st.info("Not enough data for forecast.")
 
@@ -98,5 +316,8 @@ else:
 # -------------------------------
 with st.expander("🔎 View Data"):
     st.dataframe(filtered_df)
-    csv = filtered_df.to_csv(index=False).encode('utf-8')
+    csv = compute_csv_bytes(*key)
     st.download_button("⬇️ Download CSV", data=csv, file_name="Filtered_Superstore_Data.csv", mime="text/csv")
+    parquet = compute_parquet_bytes(*key)
+    st.download_button("⬇️ Download Parquet", data=parquet, file_name="Filtered_Superstore_Data.parquet",
+                       mime="application/octet-stream")
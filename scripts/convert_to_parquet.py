@@ -0,0 +1,22 @@
+"""One-shot conversion of the raw Superstore CSV in dataset/ into the
+Parquet file read by app.py.
+
+Run from the repository root:
+
+    python scripts/convert_to_parquet.py
+"""
+import os
+
+import pandas as pd
+
+CSV_PATH = "dataset/Superstore.csv"
+PARQUET_PATH = "data/Superstore.parquet"
+
+df = pd.read_csv(CSV_PATH, encoding="latin1")
+df.columns = [c.strip() for c in df.columns]
+df["Order Date"] = pd.to_datetime(df["Order Date"], errors="coerce")
+df["Ship Date"] = pd.to_datetime(df["Ship Date"], errors="coerce")
+
+os.makedirs(os.path.dirname(PARQUET_PATH), exist_ok=True)
+df.to_parquet(PARQUET_PATH, engine="pyarrow", index=False)
+print(f"Wrote {len(df):,} rows to {PARQUET_PATH}")